@@ -5,26 +5,38 @@
 
 import argparse
 import asyncio
+import base64
+import math
 import os
+import time
 import uuid
+from collections import OrderedDict
 from contextlib import asynccontextmanager
-from typing import Any, Dict, List, Optional, TypedDict, Union
+from dataclasses import dataclass
+from datetime import datetime
+from io import BytesIO
+from typing import Any, Callable, Dict, List, Optional, TypedDict, Union
+from urllib.parse import quote_plus
+from xml.etree.ElementTree import ParseError, XMLPullParser
+from zoneinfo import ZoneInfo
 
 import aiohttp
 import uvicorn
+from anthropic import AsyncAnthropic
 from dotenv import load_dotenv
-from fastapi import BackgroundTasks, FastAPI, Request, Response
+from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import FileResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from loguru import logger
+from PIL import Image
 from pipecat_ai_small_webrtc_prebuilt.frontend import SmallWebRTCPrebuiltUI
 
 from pipecat.adapters.schemas.function_schema import FunctionSchema
 from pipecat.adapters.schemas.tools_schema import ToolsSchema
 from pipecat.audio.vad.silero import SileroVADAnalyzer
 from pipecat.audio.vad.vad_analyzer import VADParams
-from pipecat.frames.frames import LLMRunFrame, TranscriptionFrame, Frame, StartFrame, EndFrame, SystemFrame
+from pipecat.frames.frames import LLMRunFrame, TranscriptionFrame, Frame, UserImageRawFrame
 from pipecat.processors.frame_processor import FrameProcessor, FrameDirection
 from pipecat.pipeline.pipeline import Pipeline
 from pipecat.pipeline.runner import PipelineRunner
@@ -44,7 +56,6 @@ from pipecat.services.openai.tts import OpenAITTSService
 from pipecat.transports.base_transport import TransportParams
 from pipecat.transports.smallwebrtc.connection import SmallWebRTCConnection
 from pipecat.transports.smallwebrtc.request_handler import (
-    IceCandidate,
     SmallWebRTCPatchRequest,
     SmallWebRTCRequest,
     SmallWebRTCRequestHandler,
@@ -55,9 +66,44 @@ from luna_face_renderer import LunaFaceRenderer
 
 load_dotenv(override=True)
 
+
+# Config field -> environment variable it is read from
+_ENV_KEYS = {"openai_api_key": "OPENAI_API_KEY", "anthropic_api_key": "ANTHROPIC_API_KEY"}
+
+
+@dataclass(frozen=True)
+class Config:
+    """API keys read once from the environment at startup."""
+
+    openai_api_key: str
+    anthropic_api_key: str
+
+    @classmethod
+    def from_env(cls) -> "Config":
+        """Build a Config from the current environment; unset keys become empty strings."""
+        return cls(**{attr: os.getenv(env, "") for attr, env in _ENV_KEYS.items()})
+
+    def missing(self) -> List[str]:
+        """Names of the required environment variables that are not set."""
+        return [env for attr, env in _ENV_KEYS.items() if not getattr(self, attr)]
+
+
+CONFIG = Config.from_env()
+
 # Initialize the request handler
 small_webrtc_handler = SmallWebRTCRequestHandler()
 
+# Directory with the Luna frontend and static assets
+STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
+
+# Use libjpeg-turbo for photo decoding when available, otherwise fall back to PIL
+try:
+    from turbojpeg import TJPF_RGB, TurboJPEG
+
+    _turbo_jpeg = TurboJPEG()
+except (ImportError, RuntimeError, OSError):
+    _turbo_jpeg = None
+
 
 # ============== WAKE WORD FILTER ==============
 
@@ -93,7 +139,6 @@ class WakeWordFilter(FrameProcessor):
 
     def _update_active_state(self):
         """Check if we should go back to idle based on timeout."""
-        import time
         if self._is_active and self._idle_mode_enabled:
             if time.time() - self._last_activity > self.active_timeout:
                 self._is_active = False
@@ -103,14 +148,9 @@ class WakeWordFilter(FrameProcessor):
                     self.face_renderer.set_emotion("neutral")
 
     async def process_frame(self, frame: Frame, direction: FrameDirection):
-        import time
-
-        # ALWAYS pass system frames through immediately - critical for pipeline startup
-        if isinstance(frame, (StartFrame, EndFrame, SystemFrame)):
-            await self.push_frame(frame, direction)
-            return
-
-        # Only filter TranscriptionFrames - pass everything else through
+        # Only filter TranscriptionFrames - pass everything else through. This also
+        # covers Start/End/System frames, which must never be held back (critical
+        # for pipeline startup). A single check keeps the common path cheap.
         if not isinstance(frame, TranscriptionFrame):
             await self.push_frame(frame, direction)
             return
@@ -120,7 +160,7 @@ class WakeWordFilter(FrameProcessor):
             await self.push_frame(frame, direction)
             return
 
-        text = frame.text if hasattr(frame, 'text') else ""
+        text = frame.text
 
         # Check timeout
         self._update_active_state()
@@ -154,100 +194,238 @@ wake_word_filter = None
 
 # ============== TOOL IMPLEMENTATIONS ==============
 
+def get_args(params: FunctionCallParams, *specs: tuple) -> tuple:
+    """Read several tool arguments at once from (name, default) pairs."""
+    arguments = params.arguments
+    return tuple(arguments.get(name, default) for name, default in specs)
+
+
+# Shared HTTP session for tool calls (keeps connections to the APIs alive)
+http_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Return the shared HTTP session, creating it on first use."""
+    global http_session
+    if http_session is None or http_session.closed:
+        http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=8),
+            # The session is shared by all tool calls, so don't carry cookies between them
+            cookie_jar=aiohttp.DummyCookieJar(),
+        )
+    return http_session
+
+
+async def close_http_session():
+    """Close the shared HTTP session if it was created."""
+    global http_session
+    if http_session is not None and not http_session.closed:
+        await http_session.close()
+    http_session = None
+
+
+# Hosts the tools talk to; connected to once at startup so the first tool call
+# doesn't pay for DNS + TCP + TLS setup
+TOOL_API_URLS = (
+    "https://geocoding-api.open-meteo.com/",
+    "https://api.open-meteo.com/",
+    "https://news.google.com/",
+)
+
+
+async def prewarm_http_connections():
+    """Open keep-alive connections to the tool APIs (failures are ignored)."""
+    session = get_http_session()
+
+    async def _head(url: str):
+        async with session.head(url) as resp:
+            await resp.release()
+
+    results = await asyncio.gather(*(_head(url) for url in TOOL_API_URLS), return_exceptions=True)
+    for url, result in zip(TOOL_API_URLS, results):
+        if isinstance(result, Exception):
+            logger.debug(f"Could not pre-warm connection to {url}: {result}")
+
+
+class TTLCache:
+    """Small in-memory LRU cache whose entries expire after a fixed time."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        """Hold at most maxsize entries, each expiring ttl seconds after it was set."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        """Store value under key, evicting the least recently used entry if full."""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """Remove key and return its value (expired or not)."""
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+
+# Geocoding results keyed by normalized location; coordinates don't change often
+_GEO_CACHE = TTLCache(maxsize=256, ttl=86400)
+
+
+async def _geocode(session: aiohttp.ClientSession, location: str) -> Optional[tuple]:
+    """Resolve a location to (lat, lon, name, country), using the cache when possible."""
+    key = location.lower().strip()
+    cached = _GEO_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    geo_url = f"https://geocoding-api.open-meteo.com/v1/search?name={location}&count=1"
+    async with session.get(geo_url) as resp:
+        geo_data = await resp.json()
+
+    if not geo_data.get("results"):
+        return None
+
+    place = geo_data["results"][0]
+    result = (place["latitude"], place["longitude"], place["name"], place.get("country", ""))
+    _GEO_CACHE.set(key, result)
+    return result
+
+
+# Open-Meteo WMO weather codes mapped to spoken descriptions
+WEATHER_DESCRIPTIONS = {
+    0: "clear sky",
+    1: "mainly clear", 2: "partly cloudy", 3: "overcast",
+    45: "foggy", 48: "depositing rime fog",
+    51: "light drizzle", 53: "moderate drizzle", 55: "dense drizzle",
+    61: "slight rain", 63: "moderate rain", 65: "heavy rain",
+    71: "slight snow", 73: "moderate snow", 75: "heavy snow",
+    80: "slight rain showers", 81: "moderate rain showers", 82: "violent rain showers",
+    95: "thunderstorm", 96: "thunderstorm with slight hail", 99: "thunderstorm with heavy hail",
+}
+
+
 async def get_weather(params: FunctionCallParams):
     """Get weather for a location using Open-Meteo API (free, no API key needed)."""
     location = params.arguments.get("location", "New York")
     logger.info(f"Getting weather for: {location}")
 
     try:
-        async with aiohttp.ClientSession() as session:
-            # First, geocode the location
-            geo_url = f"https://geocoding-api.open-meteo.com/v1/search?name={location}&count=1"
-            async with session.get(geo_url) as resp:
-                geo_data = await resp.json()
-
-            if not geo_data.get("results"):
-                await params.result_callback(f"I couldn't find the location '{location}'. Please try a different city name.")
-                return
+        session = get_http_session()
+
+        # First, geocode the location
+        place = await _geocode(session, location)
+        if place is None:
+            await params.result_callback(f"I couldn't find the location '{location}'. Please try a different city name.")
+            return
+
+        lat, lon, city_name, country = place
+
+        # Get weather data
+        weather_url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&current=temperature_2m,weather_code,wind_speed_10m&temperature_unit=fahrenheit"
+        async with session.get(weather_url) as resp:
+            weather_data = await resp.json()
+
+        current = weather_data.get("current", {})
+        temp = current.get("temperature_2m", "unknown")
+        wind = current.get("wind_speed_10m", "unknown")
+        weather_code = current.get("weather_code", 0)
 
-            lat = geo_data["results"][0]["latitude"]
-            lon = geo_data["results"][0]["longitude"]
-            city_name = geo_data["results"][0]["name"]
-            country = geo_data["results"][0].get("country", "")
-
-            # Get weather data
-            weather_url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&current=temperature_2m,weather_code,wind_speed_10m&temperature_unit=fahrenheit"
-            async with session.get(weather_url) as resp:
-                weather_data = await resp.json()
-
-            current = weather_data.get("current", {})
-            temp = current.get("temperature_2m", "unknown")
-            wind = current.get("wind_speed_10m", "unknown")
-            weather_code = current.get("weather_code", 0)
-
-            # Map weather codes to descriptions
-            weather_descriptions = {
-                0: "clear sky",
-                1: "mainly clear", 2: "partly cloudy", 3: "overcast",
-                45: "foggy", 48: "depositing rime fog",
-                51: "light drizzle", 53: "moderate drizzle", 55: "dense drizzle",
-                61: "slight rain", 63: "moderate rain", 65: "heavy rain",
-                71: "slight snow", 73: "moderate snow", 75: "heavy snow",
-                80: "slight rain showers", 81: "moderate rain showers", 82: "violent rain showers",
-                95: "thunderstorm", 96: "thunderstorm with slight hail", 99: "thunderstorm with heavy hail",
-            }
-            condition = weather_descriptions.get(weather_code, "unknown conditions")
-
-            result = f"The weather in {city_name}, {country} is currently {temp} degrees Fahrenheit with {condition}. Wind speed is {wind} mph."
-            await params.result_callback(result)
+        condition = WEATHER_DESCRIPTIONS.get(weather_code, "unknown conditions")
+
+        result = f"The weather in {city_name}, {country} is currently {temp} degrees Fahrenheit with {condition}. Wind speed is {wind} mph."
+        await params.result_callback(result)
 
     except Exception as e:
         logger.error(f"Weather API error: {e}")
         await params.result_callback(f"I had trouble getting the weather. Please try again.")
 
 
+# Headlines keyed by normalized query; news changes quickly, so keep them briefly
+_SEARCH_CACHE = TTLCache(maxsize=1000, ttl=300)
+
+
+async def read_rss_titles(resp: aiohttp.ClientResponse, limit: int) -> List[str]:
+    """Stream an RSS response and return the first `limit` item titles.
+
+    Parsing stops once enough titles are found or the feed turns out to be
+    malformed. The rest of the body is still drained so the connection can go
+    back to the shared session's pool.
+    """
+    parser = XMLPullParser(events=("start", "end"))
+    titles: List[str] = []
+    in_item = False
+    done = False
+
+    async for chunk in resp.content.iter_chunked(8192):
+        if done:
+            continue
+        try:
+            parser.feed(chunk)
+            for event, elem in parser.read_events():
+                if elem.tag == "item":
+                    in_item = event == "start"
+                elif event == "end" and in_item and elem.tag == "title":
+                    # Skip quoted titles (Google News uses them for search-query items)
+                    title = (elem.text or "").strip()
+                    if title and not title.startswith('"'):
+                        titles.append(title)
+                        if len(titles) >= limit:
+                            done = True
+                            break
+                if event == "end" and elem.tag == "item":
+                    elem.clear()
+        except ParseError as e:
+            logger.warning(f"Malformed RSS feed: {e}")
+            done = True
+
+    return titles
+
+
 async def web_search(params: FunctionCallParams):
     """Search the web using Google News RSS."""
     query = params.arguments.get("query", "")
     logger.info(f"Searching web for: {query}")
 
     try:
-        from urllib.parse import quote_plus
-        import re
+        cache_key = query.lower().strip()
+        results = _SEARCH_CACHE.get(cache_key)
+        if results is None:
+            session = get_http_session()
 
-        async with aiohttp.ClientSession() as session:
             # Use Google News RSS feed for search
             url = f"https://news.google.com/rss/search?q={quote_plus(query)}&hl=en-US&gl=US&ceid=US:en"
 
             async with session.get(url) as resp:
-                rss = await resp.text()
-
-            # Extract news titles from RSS
-            results = []
-
-            # Find title elements - they contain the news headlines
-            title_pattern = r'<title>([^<]+)</title>'
-            titles = re.findall(title_pattern, rss)
-
-            # Skip the first two titles (feed title and "Google News")
-            news_titles = [t for t in titles[2:] if t and not t.startswith('"')]
-
-            # Get top 3 headlines
-            for title in news_titles[:3]:
-                # Clean up the title (remove source suffix like " - BBC")
-                clean_title = title.strip()
-                if clean_title:
-                    results.append(clean_title)
+                # Get top 3 headlines from the RSS items
+                results = await read_rss_titles(resp, limit=3)
 
             if results:
-                # Combine the headlines
-                combined = " | ".join(results)
-                # Truncate if too long for voice
-                if len(combined) > 600:
-                    combined = combined[:600] + "..."
-                await params.result_callback(f"SUCCESS - LIVE NEWS (January 2026): {combined}")
-            else:
-                await params.result_callback(f"I couldn't find news results for '{query}'. Try a different search term.")
+                _SEARCH_CACHE.set(cache_key, results)
+
+        if results:
+            # Combine the headlines
+            combined = " | ".join(results)
+            # Truncate if too long for voice
+            if len(combined) > 600:
+                combined = combined[:600] + "..."
+            await params.result_callback(f"SUCCESS - LIVE NEWS (January 2026): {combined}")
+        else:
+            await params.result_callback(f"I couldn't find news results for '{query}'. Try a different search term.")
 
     except Exception as e:
         logger.error(f"Search error: {e}")
@@ -256,14 +434,11 @@ async def web_search(params: FunctionCallParams):
 
 async def get_current_time(params: FunctionCallParams):
     """Get the current time for a timezone."""
-    from datetime import datetime
-    import pytz
-
     timezone = params.arguments.get("timezone", "America/New_York")
     logger.info(f"Getting time for timezone: {timezone}")
 
     try:
-        tz = pytz.timezone(timezone)
+        tz = ZoneInfo(timezone)
         current_time = datetime.now(tz)
         formatted_time = current_time.strftime("%I:%M %p on %A, %B %d, %Y")
         await params.result_callback(f"The current time in {timezone} is {formatted_time}.")
@@ -278,8 +453,67 @@ face_renderer = None
 current_transport = None  # For sending messages to frontend
 pending_photo_callback = None  # Callback for when photo is received
 latest_photo_data = None  # Store the latest captured photo
+latest_photo_time = 0.0  # When latest_photo_data arrived (time.monotonic())
+
+# Reuse a captured photo instead of asking the frontend again if it's this recent
+PHOTO_MAX_AGE_SECS = 0.5
 
 VALID_EMOTIONS = ["neutral", "happy", "sad", "angry", "surprised", "thinking", "confused", "excited", "cat"]
+_VALID_EMOTION_SET = frozenset(VALID_EMOTIONS)
+_UNKNOWN_EMOTION_MSG = f"Unknown emotion. Valid emotions are: {', '.join(VALID_EMOTIONS)}"
+# RTVI payloads for each emotion. Only the data is shared: frames need a fresh
+# id each time, or the RTVI observer drops them as already seen.
+_EMOTION_MESSAGES = {e: {"type": "emotion", "emotion": e} for e in VALID_EMOTIONS}
+
+# Pending auto-clear timers, one per display kind ("pixel_art", "text")
+_auto_clear_timers: Dict[str, asyncio.TimerHandle] = {}
+
+
+MAX_DISPLAY_DURATION = 60.0
+
+
+def display_duration(value, default: float = 8.0) -> float:
+    """Coerce an LLM-supplied duration to seconds in (0, MAX_DISPLAY_DURATION], else default."""
+    try:
+        duration = float(value)
+    except (TypeError, ValueError):
+        return default
+    if not math.isfinite(duration) or duration <= 0:
+        return default
+    return min(duration, MAX_DISPLAY_DURATION)
+
+
+def schedule_auto_clear(kind: str, duration: float, clear: Callable[[], None]):
+    """Call clear() after duration seconds, replacing any pending timer for kind."""
+    cancel_auto_clear(kind)
+
+    def fire():
+        _auto_clear_timers.pop(kind, None)
+        clear()
+
+    _auto_clear_timers[kind] = asyncio.get_running_loop().call_later(duration, fire)
+
+
+def cancel_auto_clear(kind: str):
+    """Cancel the pending auto-clear timer for kind, if any."""
+    timer = _auto_clear_timers.pop(kind, None)
+    if timer:
+        timer.cancel()
+
+
+def _auto_clear_pixel_art():
+    """Return to the face once a drawing's display time is up."""
+    if face_renderer:
+        face_renderer.clear_pixel_art()
+        logger.info("Auto-cleared pixel art after duration")
+
+
+def _auto_clear_text():
+    """Return to the face once a text's display time is up."""
+    if face_renderer:
+        face_renderer.clear_text()
+        logger.info("Auto-cleared text after duration")
+
 
 async def set_emotion(params: FunctionCallParams):
     """Set Luna's facial emotion."""
@@ -287,8 +521,8 @@ async def set_emotion(params: FunctionCallParams):
     emotion = params.arguments.get("emotion", "neutral").lower()
     logger.info(f"Setting emotion to: {emotion}")
 
-    if emotion not in VALID_EMOTIONS:
-        await params.result_callback(f"Unknown emotion. Valid emotions are: {', '.join(VALID_EMOTIONS)}")
+    if emotion not in _VALID_EMOTION_SET:
+        await params.result_callback(_UNKNOWN_EMOTION_MSG)
         return
 
     # Update the face renderer
@@ -297,10 +531,7 @@ async def set_emotion(params: FunctionCallParams):
 
     # Also send emotion update to frontend via RTVI (for any client-side UI)
     if current_task:
-        emotion_frame = RTVIServerMessageFrame(data={
-            "type": "emotion",
-            "emotion": emotion
-        })
+        emotion_frame = RTVIServerMessageFrame(data=_EMOTION_MESSAGES[emotion])
         await current_task.queue_frames([emotion_frame])
 
     await params.result_callback(f"Emotion set to {emotion}")
@@ -309,23 +540,31 @@ async def set_emotion(params: FunctionCallParams):
 async def draw_pixel_art(params: FunctionCallParams):
     """Draw pixel art on Luna's screen (12x16 grid)."""
     global face_renderer
-    pixels = params.arguments.get("pixels", [])
-    background = params.arguments.get("background", "#1E1E28")
-    duration = params.arguments.get("duration", 8)  # Default 8 seconds for better visibility
+    pixels, background, duration = get_args(
+        params,
+        ("pixels", []),
+        ("background", "#1E1E28"),
+        ("duration", 8),  # Default 8 seconds for better visibility
+    )
+    duration = display_duration(duration)
     logger.info(f"Drawing pixel art with {len(pixels)} pixels, bg={background}, duration={duration}s")
 
     if not pixels:
         await params.result_callback("No pixels provided. Please specify pixels to draw.")
         return
 
-    # Validate and clean up pixels
-    valid_pixels = []
+    # Validate and clean up pixels, keeping only the last color given for each cell
+    cells = {}
     for p in pixels:
-        x = p.get("x")
-        y = p.get("y")
-        color = p.get("color", "#FFFFFF")
-        if x is not None and y is not None:
-            valid_pixels.append({"x": int(x), "y": int(y), "color": str(color)})
+        if not isinstance(p, dict):
+            continue
+        try:
+            x = int(p["x"])
+            y = int(p["y"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        cells[(x, y)] = str(p.get("color", "#FFFFFF"))
+    valid_pixels = [{"x": x, "y": y, "color": color} for (x, y), color in cells.items()]
 
     if not valid_pixels:
         await params.result_callback("No valid pixels found. Each pixel needs x, y, and color.")
@@ -334,16 +573,10 @@ async def draw_pixel_art(params: FunctionCallParams):
     # Update the face renderer
     if face_renderer:
         face_renderer.set_pixel_art(valid_pixels, background)
-        await params.result_callback(f"Drawing displayed for {duration} seconds")
+        await params.result_callback(f"Drawing displayed for {duration:g} seconds")
 
-        # Auto-clear after duration
-        async def auto_clear():
-            await asyncio.sleep(duration)
-            if face_renderer:
-                face_renderer.clear_pixel_art()
-                logger.info("Auto-cleared pixel art after duration")
-
-        asyncio.create_task(auto_clear())
+        # Auto-clear after duration (replaces any earlier pending clear)
+        schedule_auto_clear("pixel_art", duration, _auto_clear_pixel_art)
     else:
         await params.result_callback("Drawing system not ready")
 
@@ -352,6 +585,7 @@ async def clear_drawing(params: FunctionCallParams):
     """Clear pixel art and return to normal face display."""
     global face_renderer
     logger.info("Clearing pixel art")
+    cancel_auto_clear("pixel_art")
 
     if face_renderer:
         face_renderer.clear_pixel_art()
@@ -363,13 +597,17 @@ async def clear_drawing(params: FunctionCallParams):
 async def display_text(params: FunctionCallParams):
     """Display text on Luna's screen."""
     global face_renderer
-    text = params.arguments.get("text", "")
-    font_size = params.arguments.get("font_size", "medium")
-    color = params.arguments.get("color", "#FFFFFF")
-    background = params.arguments.get("background", "#1E1E28")
-    align = params.arguments.get("align", "center")
-    valign = params.arguments.get("valign", "center")
-    duration = params.arguments.get("duration", 8)  # Default 8 seconds for better visibility
+    text, font_size, color, background, align, valign, duration = get_args(
+        params,
+        ("text", ""),
+        ("font_size", "medium"),
+        ("color", "#FFFFFF"),
+        ("background", "#1E1E28"),
+        ("align", "center"),
+        ("valign", "center"),
+        ("duration", 8),  # Default 8 seconds for better visibility
+    )
+    duration = display_duration(duration)
 
     logger.info(f"Displaying text: '{text[:30]}...' size={font_size}")
 
@@ -379,16 +617,10 @@ async def display_text(params: FunctionCallParams):
 
     if face_renderer:
         face_renderer.set_text(text, font_size, color, background, align, valign)
-        await params.result_callback(f"Text displayed for {duration} seconds")
+        await params.result_callback(f"Text displayed for {duration:g} seconds")
 
-        # Auto-clear after duration
-        async def auto_clear():
-            await asyncio.sleep(duration)
-            if face_renderer:
-                face_renderer.clear_text()
-                logger.info("Auto-cleared text after duration")
-
-        asyncio.create_task(auto_clear())
+        # Auto-clear after duration (replaces any earlier pending clear)
+        schedule_auto_clear("text", duration, _auto_clear_text)
     else:
         await params.result_callback("Display not ready")
 
@@ -397,6 +629,7 @@ async def clear_text_display(params: FunctionCallParams):
     """Clear text and return to face display."""
     global face_renderer
     logger.info("Clearing text display")
+    cancel_auto_clear("text")
 
     if face_renderer:
         face_renderer.clear_text()
@@ -411,7 +644,7 @@ async def stay_quiet(params: FunctionCallParams):
     emotion = params.arguments.get("emotion", "neutral").lower()
     logger.info(f"Staying quiet with emotion: {emotion}")
 
-    if emotion not in VALID_EMOTIONS:
+    if emotion not in _VALID_EMOTION_SET:
         emotion = "neutral"
 
     # Update the face renderer with the emotion
@@ -422,6 +655,20 @@ async def stay_quiet(params: FunctionCallParams):
     await params.result_callback("")
 
 
+def decode_jpeg_rgb(jpeg_bytes: bytes) -> tuple:
+    """Decode a JPEG into packed RGB bytes, returning (raw_bytes, (width, height))."""
+    if _turbo_jpeg is not None:
+        arr = _turbo_jpeg.decode(jpeg_bytes, pixel_format=TJPF_RGB)
+        height, width, _ = arr.shape
+        return arr.tobytes(), (width, height)
+
+    img = Image.open(BytesIO(jpeg_bytes))
+    # Most camera JPEGs already decode to RGB, so skip the extra copy convert() makes
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    return img.tobytes(), img.size
+
+
 async def take_photo(params: FunctionCallParams):
     """Take a photo from the user's camera and analyze it."""
     global current_task, latest_photo_data, pending_photo_callback
@@ -429,52 +676,48 @@ async def take_photo(params: FunctionCallParams):
 
     # Request photo from frontend via RTVI message
     if current_task:
-        # Send request to frontend to capture photo
-        photo_request_frame = RTVIServerMessageFrame(data={
-            "type": "capture_photo"
-        })
-        await current_task.queue_frames([photo_request_frame])
+        if latest_photo_data and time.monotonic() - latest_photo_time <= PHOTO_MAX_AGE_SECS:
+            logger.debug("Reusing recently captured photo")
+        else:
+            # Send request to frontend to capture photo
+            photo_request_frame = RTVIServerMessageFrame(data={
+                "type": "capture_photo"
+            })
+            await current_task.queue_frames([photo_request_frame])
 
-        # Wait for photo to arrive (up to 3 seconds)
-        photo_event = asyncio.Event()
-        latest_photo_data = None
+            # Wait for photo to arrive (up to 3 seconds)
+            photo_event = asyncio.Event()
+            latest_photo_data = None
 
-        def photo_received():
-            photo_event.set()
+            def photo_received():
+                photo_event.set()
 
-        pending_photo_callback = photo_received
+            pending_photo_callback = photo_received
 
-        try:
-            await asyncio.wait_for(photo_event.wait(), timeout=3.0)
-        except asyncio.TimeoutError:
-            pending_photo_callback = None
-            await params.result_callback("I couldn't capture a photo. Make sure the camera is enabled.")
-            return
+            try:
+                await asyncio.wait_for(photo_event.wait(), timeout=3.0)
+            except asyncio.TimeoutError:
+                pending_photo_callback = None
+                await params.result_callback("I couldn't capture a photo. Make sure the camera is enabled.")
+                return
 
-        pending_photo_callback = None
+            pending_photo_callback = None
 
         if latest_photo_data:
             # Photo received - decode base64 and create a frame
-            import base64
-            from io import BytesIO
-            from PIL import Image
-            from pipecat.frames.frames import UserImageRawFrame
-            from pipecat.processors.frame_processor import FrameDirection
-
             try:
-                # Decode base64 JPEG
-                jpeg_bytes = base64.b64decode(latest_photo_data)
-
-                # Open with PIL to get dimensions and convert to RGB bytes
-                img = Image.open(BytesIO(jpeg_bytes))
-                img_rgb = img.convert('RGB')
-                raw_bytes = img_rgb.tobytes()
+                # Decode base64 JPEG straight to RGB bytes and get dimensions. JPEG
+                # decoding is CPU-bound, so keep it off the event loop that's
+                # streaming audio and video.
+                raw_bytes, size = await asyncio.to_thread(
+                    decode_jpeg_rgb, base64.b64decode(latest_photo_data)
+                )
 
                 # Create a UserImageRawFrame with append_to_context=True
                 # This will add the image to the LLM context
                 image_frame = UserImageRawFrame(
                     image=raw_bytes,
-                    size=(img_rgb.width, img_rgb.height),
+                    size=size,
                     format="RGB",
                     user_id="user",
                     text="Describe what you see in this photo from the user's camera.",
@@ -649,70 +892,29 @@ stay_quiet_tool = FunctionSchema(
     required=["emotion"],
 )
 
-tools = ToolsSchema(standard_tools=[weather_tool, search_tool, time_tool, emotion_tool, draw_tool, clear_draw_tool, photo_tool, display_text_tool, clear_text_tool, stay_quiet_tool])
-
-
-# ============== BOT LOGIC ==============
-
-async def run_bot(webrtc_connection: SmallWebRTCConnection):
-    """Main bot logic - runs when a client connects."""
-    global face_renderer
-    logger.info("Starting bot")
-
-    # Create the face renderer (240x320 portrait)
-    face_renderer = LunaFaceRenderer(width=240, height=320, fps=15)
+# Each tool's schema paired with its handler; the LLM registration uses the schema's name
+TOOLS = [
+    (weather_tool, get_weather),
+    (search_tool, web_search),
+    (time_tool, get_current_time),
+    (emotion_tool, set_emotion),
+    (draw_tool, draw_pixel_art),
+    (clear_draw_tool, clear_drawing),
+    (photo_tool, take_photo),
+    (display_text_tool, display_text),
+    (clear_text_tool, clear_text_display),
+    (stay_quiet_tool, stay_quiet),
+]
 
-    # Create transport using the WebRTC connection
-    transport = SmallWebRTCTransport(
-        webrtc_connection=webrtc_connection,
-        params=TransportParams(
-            audio_in_enabled=True,
-            audio_out_enabled=True,
-            video_out_enabled=True,
-            video_out_width=240,
-            video_out_height=320,
-            vad_analyzer=SileroVADAnalyzer(params=VADParams(
-                stop_secs=0.5,    # Wait longer before considering speech stopped (reduces false interrupts)
-                min_volume=0.7,   # Require louder audio to trigger VAD (helps ignore speaker feedback)
-            )),
-        ),
-    )
+tools = ToolsSchema(standard_tools=[schema for schema, _ in TOOLS])
 
-    # Speech-to-Text: OpenAI (Whisper)
-    stt = OpenAISTTService(
-        api_key=os.getenv("OPENAI_API_KEY"),
-        model="gpt-4o-transcribe",
-    )
+# Tool name -> handler, registered on the LLM for every session
+TOOL_HANDLERS = {schema.name: handler for schema, handler in TOOLS}
 
-    # Text-to-Speech: OpenAI
-    tts = OpenAITTSService(
-        api_key=os.getenv("OPENAI_API_KEY"),
-        voice="nova",
-    )
 
-    # LLM: Anthropic Claude (using Haiku for speed)
-    llm = AnthropicLLMService(
-        api_key=os.getenv("ANTHROPIC_API_KEY"),
-        model="claude-3-5-haiku-latest",
-    )
+# ============== SYSTEM PROMPT ==============
 
-    # Register tool handlers
-    llm.register_function("get_weather", get_weather)
-    llm.register_function("web_search", web_search)
-    llm.register_function("get_current_time", get_current_time)
-    llm.register_function("set_emotion", set_emotion)
-    llm.register_function("draw_pixel_art", draw_pixel_art)
-    llm.register_function("clear_drawing", clear_drawing)
-    llm.register_function("take_photo", take_photo)
-    llm.register_function("display_text", display_text)
-    llm.register_function("clear_text_display", clear_text_display)
-    llm.register_function("stay_quiet", stay_quiet)
-
-    # System prompt
-    messages = [
-        {
-            "role": "system",
-            "content": """Your name is Luna. You are a friendly, helpful voice assistant with an animated face.
+SYSTEM_PROMPT = """Your name is Luna. You are a friendly, helpful voice assistant with an animated face.
 
 CRITICAL - SEARCH RESULTS ARE ALWAYS CORRECT:
 Your training data is from 2024 and is OUTDATED. The current date is January 2026.
@@ -806,9 +1008,131 @@ When you call stay_quiet:
 
 Tools: get_weather, web_search, get_current_time, set_emotion, draw_pixel_art, clear_drawing, take_photo, display_text, clear_text_display, stay_quiet
 
-Be warm but brief. Your name is Luna.""",
-        },
-    ]
+Be warm but brief. Your name is Luna."""
+
+
+# ============== BOT LOGIC ==============
+
+# UI settings sent to every client once it's ready (the same for all sessions)
+RTVI_UI_CONFIG = {
+    "show_text_container": True,
+    "show_debug_container": False,
+}
+
+# Silero VAD analyzers from finished sessions. Loading the ONNX model takes a
+# while, so analyzers are reused instead of recreated for every connection. Each
+# analyzer keeps per-stream state (audio buffer, smoothed volume, model RNN state),
+# so it serves one session at a time and is reset before being handed out again.
+_vad_pool: List[SileroVADAnalyzer] = []
+
+
+# Anthropic client shared by all sessions, so its HTTP connection pool (and the
+# TLS connection to the API) outlives individual calls
+anthropic_client: Optional[AsyncAnthropic] = None
+
+
+def get_anthropic_client() -> AsyncAnthropic:
+    """Return the shared Anthropic client, creating it on first use."""
+    global anthropic_client
+    if anthropic_client is None:
+        anthropic_client = AsyncAnthropic(api_key=CONFIG.anthropic_api_key)
+    return anthropic_client
+
+
+async def close_anthropic_client():
+    """Close the shared Anthropic client if it was created."""
+    global anthropic_client
+    if anthropic_client is not None:
+        await anthropic_client.close()
+    anthropic_client = None
+
+
+def create_vad_analyzer() -> SileroVADAnalyzer:
+    """Create a VAD analyzer (blocking: loads the ONNX model)."""
+    return SileroVADAnalyzer(params=VADParams(
+        stop_secs=0.5,    # Wait longer before considering speech stopped (reduces false interrupts)
+        min_volume=0.7,   # Require louder audio to trigger VAD (helps ignore speaker feedback)
+    ))
+
+
+async def acquire_vad_analyzer() -> SileroVADAnalyzer:
+    """Get an idle VAD analyzer from the pool, or create one in a worker thread."""
+    if _vad_pool:
+        analyzer = _vad_pool.pop()
+        # Drop the previous session's buffered audio, model state and any params
+        # changed by a VADParamsUpdateFrame
+        analyzer.reset()
+        return analyzer
+    return await asyncio.to_thread(create_vad_analyzer)
+
+
+def release_vad_analyzer(analyzer: SileroVADAnalyzer):
+    """Return a VAD analyzer to the pool once its session has ended."""
+    _vad_pool.append(analyzer)
+
+
+async def run_bot(webrtc_connection: SmallWebRTCConnection):
+    """Main bot logic - runs when a client connects."""
+    # Reuse a VAD analyzer from a finished session if one is available
+    vad_analyzer = await acquire_vad_analyzer()
+    try:
+        await run_bot_session(webrtc_connection, vad_analyzer)
+    finally:
+        release_vad_analyzer(vad_analyzer)
+
+
+async def run_bot_session(
+    webrtc_connection: SmallWebRTCConnection, vad_analyzer: SileroVADAnalyzer
+):
+    """Build and run the pipeline for one client connection."""
+    global face_renderer
+    logger.info("Starting bot")
+
+    # Create the face renderer (240x320 portrait)
+    face_renderer = LunaFaceRenderer(width=240, height=320, fps=15)
+
+    # Create transport using the WebRTC connection
+    transport = SmallWebRTCTransport(
+        webrtc_connection=webrtc_connection,
+        params=TransportParams(
+            audio_in_enabled=True,
+            audio_out_enabled=True,
+            video_out_enabled=True,
+            video_out_width=240,
+            video_out_height=320,
+            vad_analyzer=vad_analyzer,
+        ),
+    )
+
+    # Speech-to-Text: OpenAI (Whisper)
+    stt = OpenAISTTService(
+        api_key=CONFIG.openai_api_key,
+        model="gpt-4o-transcribe",
+    )
+
+    # Text-to-Speech: OpenAI
+    tts = OpenAITTSService(
+        api_key=CONFIG.openai_api_key,
+        voice="nova",
+    )
+
+    # LLM: Anthropic Claude (using Haiku for speed)
+    # Prompt caching lets Anthropic reuse the static tools + system prompt prefix
+    # instead of re-processing it on every turn
+    llm = AnthropicLLMService(
+        api_key=CONFIG.anthropic_api_key,
+        client=get_anthropic_client(),
+        model="claude-3-5-haiku-latest",
+        params=AnthropicLLMService.InputParams(enable_prompt_caching=True),
+    )
+
+    # Register tool handlers
+    for name, handler in TOOL_HANDLERS.items():
+        llm.register_function(name, handler)
+
+    # System prompt (a module-level constant so it's byte-identical across
+    # sessions, which keeps Anthropic's prompt cache warm)
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
 
     # Context aggregator manages conversation history - pass tools to context
     context = LLMContext(messages, tools)
@@ -862,11 +1186,7 @@ Be warm but brief. Your name is Luna.""",
         await rtvi.set_bot_ready()
 
         # Enable text display in the prebuilt UI
-        ui_config = {
-            "show_text_container": True,
-            "show_debug_container": False,
-        }
-        rtvi_frame = RTVIServerMessageFrame(data=ui_config)
+        rtvi_frame = RTVIServerMessageFrame(data=RTVI_UI_CONFIG)
         await task.queue_frames([rtvi_frame])
 
     @transport.event_handler("on_client_connected")
@@ -880,7 +1200,7 @@ Be warm but brief. Your name is Luna.""",
     @transport.event_handler("on_app_message")
     async def on_app_message(transport, message, sender):
         """Handle incoming app messages (like gaze data, photo data)."""
-        global latest_photo_data, pending_photo_callback
+        global latest_photo_data, latest_photo_time, pending_photo_callback
         try:
             data = message if isinstance(message, dict) else {}
             msg_type = data.get("type")
@@ -895,6 +1215,7 @@ Be warm but brief. Your name is Luna.""",
                 # Received photo from frontend
                 logger.info("Received photo data from frontend")
                 latest_photo_data = data.get("data")  # Base64 JPEG
+                latest_photo_time = time.monotonic()
                 if pending_photo_callback:
                     pending_photo_callback()
 
@@ -932,8 +1253,9 @@ class StartBotResult(TypedDict, total=False):
     iceConfig: Optional[IceConfig]
 
 
-# Store active sessions
-active_sessions: Dict[str, Dict[str, Any]] = {}
+# Store active sessions. An entry is removed when its bot finishes; the size and
+# lifetime bounds only matter for sessions that never connect or are abandoned.
+active_sessions = TTLCache(maxsize=256, ttl=6 * 3600)
 
 
 def create_app():
@@ -952,8 +1274,7 @@ def create_app():
     app.mount("/client", SmallWebRTCPrebuiltUI)
 
     # Mount static files for Luna face
-    static_dir = os.path.join(os.path.dirname(__file__), "static")
-    app.mount("/static", StaticFiles(directory=static_dir), name="static")
+    app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
     @app.get("/", include_in_schema=False)
     async def root_redirect():
@@ -962,9 +1283,7 @@ def create_app():
     @app.get("/luna", include_in_schema=False)
     async def luna_page():
         """Serve the Luna custom frontend with face tracking."""
-        from fastapi.responses import FileResponse
-        static_dir = os.path.join(os.path.dirname(__file__), "static")
-        return FileResponse(os.path.join(static_dir, "luna.html"))
+        return FileResponse(os.path.join(STATIC_DIR, "luna.html"))
 
     @app.post("/start")
     async def rtvi_start(request: Request):
@@ -976,7 +1295,7 @@ def create_app():
             request_data = {}
 
         session_id = str(uuid.uuid4())
-        active_sessions[session_id] = request_data
+        active_sessions.set(session_id, request_data)
 
         result: StartBotResult = {"sessionId": session_id}
         if request_data.get("enableDefaultIceServers"):
@@ -986,12 +1305,21 @@ def create_app():
 
         return result
 
-    @app.post("/api/offer")
-    async def offer(request: SmallWebRTCRequest, background_tasks: BackgroundTasks):
-        """Handle WebRTC offer requests."""
-
+    async def run_session_bot(connection: SmallWebRTCConnection, session_id: Optional[str]):
+        """Run the bot, then forget the session it was started from."""
+        try:
+            await run_bot(connection)
+        finally:
+            if session_id:
+                active_sessions.pop(session_id)
+
+    async def handle_offer(
+        request: SmallWebRTCRequest,
+        background_tasks: BackgroundTasks,
+        session_id: Optional[str] = None,
+    ):
         async def webrtc_connection_callback(connection: SmallWebRTCConnection):
-            background_tasks.add_task(run_bot, connection)
+            background_tasks.add_task(run_session_bot, connection, session_id)
 
         answer = await small_webrtc_handler.handle_web_request(
             request=request,
@@ -999,54 +1327,55 @@ def create_app():
         )
         return answer
 
+    @app.post("/api/offer")
+    async def offer(request: SmallWebRTCRequest, background_tasks: BackgroundTasks):
+        """Handle WebRTC offer requests."""
+        return await handle_offer(request, background_tasks)
+
     @app.patch("/api/offer")
     async def ice_candidate(request: SmallWebRTCPatchRequest):
         """Handle WebRTC ICE candidate requests."""
         await small_webrtc_handler.handle_patch_request(request)
         return {"status": "success"}
 
+    def require_session(session_id: str):
+        """Reject requests for session ids that /start never issued (or that expired)."""
+        if active_sessions.get(session_id) is None:
+            raise HTTPException(status_code=404, detail="Invalid or not-yet-ready session_id")
+
+    @app.post("/sessions/{session_id}/api/offer", dependencies=[Depends(require_session)])
+    async def session_offer(
+        session_id: str, request: SmallWebRTCRequest, background_tasks: BackgroundTasks
+    ):
+        """Handle WebRTC offers for a session created via /start."""
+        return await handle_offer(request, background_tasks, session_id)
+
+    @app.patch("/sessions/{session_id}/api/offer", dependencies=[Depends(require_session)])
+    async def session_ice_candidate(request: SmallWebRTCPatchRequest):
+        """Handle WebRTC ICE candidates for a session created via /start."""
+        return await ice_candidate(request)
+
     @app.api_route(
         "/sessions/{session_id}/{path:path}",
         methods=["GET", "POST", "PUT", "PATCH", "DELETE"],
+        dependencies=[Depends(require_session)],
     )
-    async def proxy_request(
-        session_id: str, path: str, request: Request, background_tasks: BackgroundTasks
-    ):
-        """Proxy requests to session-specific endpoints."""
-        active_session = active_sessions.get(session_id)
-        if active_session is None:
-            return Response(content="Invalid or not-yet-ready session_id", status_code=404)
-
-        if path.endswith("api/offer"):
-            try:
-                request_data = await request.json()
-                if request.method == "POST":
-                    webrtc_request = SmallWebRTCRequest(
-                        sdp=request_data["sdp"],
-                        type=request_data["type"],
-                        pc_id=request_data.get("pc_id"),
-                        restart_pc=request_data.get("restart_pc"),
-                        request_data=request_data.get("request_data")
-                        or request_data.get("requestData"),
-                    )
-                    return await offer(webrtc_request, background_tasks)
-                elif request.method == "PATCH":
-                    patch_request = SmallWebRTCPatchRequest(
-                        pc_id=request_data["pc_id"],
-                        candidates=[IceCandidate(**c) for c in request_data.get("candidates", [])],
-                    )
-                    return await ice_candidate(patch_request)
-            except Exception as e:
-                logger.error(f"Failed to parse WebRTC request: {e}")
-                return Response(content="Invalid WebRTC request", status_code=400)
-
+    async def proxy_request(path: str):
+        """Accept other session-specific requests from the prebuilt UI."""
         logger.info(f"Received request for path: {path}")
         return Response(status_code=200)
 
     @asynccontextmanager
     async def lifespan(app: FastAPI):
+        # Load one VAD model up front so the first connection doesn't wait for it
+        release_vad_analyzer(await asyncio.to_thread(create_vad_analyzer))
+        # Warm up in the background so server startup isn't held up by the network
+        prewarm_task = asyncio.create_task(prewarm_http_connections())
         yield
+        prewarm_task.cancel()
         await small_webrtc_handler.close()
+        await close_http_session()
+        await close_anthropic_client()
 
     app.router.lifespan_context = lifespan
 
@@ -1059,9 +1388,16 @@ if __name__ == "__main__":
     parser.add_argument("--port", type=int, default=7860, help="Port (default: 7860)")
     args = parser.parse_args()
 
+    # Fail at startup rather than when the first client connects
+    missing = CONFIG.missing()
+    if missing:
+        parser.error(f"missing required environment variables: {', '.join(missing)}")
+
     print(f"\n🎙️  Voice Bot starting at http://{args.host}:{args.port}")
     print("   Tools available: weather, web search, current time")
     print("   Open this URL in your browser to start talking!\n")
 
     app = create_app()
-    uvicorn.run(app, host=args.host, port=args.port)
+    # Per-request access logging goes through Python logging on every request;
+    # the app already logs what matters via loguru
+    uvicorn.run(app, host=args.host, port=args.port, access_log=False)
@@ -188,6 +188,17 @@ class SileroVADAnalyzer(VADAnalyzer):
 
         super().set_sample_rate(sample_rate)
 
+    def reset(self, params: Optional[VADParams] = None):
+        """Clear per-stream state, including the Silero model's recurrent state.
+
+        Args:
+            params: VAD parameters to use from now on. If None, the parameters
+                given at construction are restored.
+        """
+        super().reset(params)
+        self._model.reset_states()
+        self._last_reset_time = 0
+
     def num_frames_required(self) -> int:
         """Get the number of audio frames required for VAD analysis.
 
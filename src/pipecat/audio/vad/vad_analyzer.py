@@ -77,7 +77,8 @@ class VADAnalyzer(ABC):
         """
         self._init_sample_rate = sample_rate
         self._sample_rate = 0
-        self._params = params or VADParams()
+        self._init_params = params or VADParams()
+        self._params = self._init_params
         self._num_channels = 1
 
         self._vad_buffer = b""
@@ -147,6 +148,24 @@ class VADAnalyzer(ABC):
         self._sample_rate = self._init_sample_rate or sample_rate
         self.set_params(self._params)
 
+    def reset(self, params: Optional[VADParams] = None):
+        """Clear per-stream state so the analyzer can be reused for a new stream.
+
+        Drops any buffered audio and the smoothed volume, and restores the VAD
+        parameters, undoing changes made with `set_params()` while the
+        previous stream was running.
+
+        Args:
+            params: VAD parameters to use from now on. If None, the parameters
+                given at construction are restored.
+        """
+        self._vad_buffer = b""
+        self._prev_volume = 0
+        self._params = params or self._init_params
+        # Without a sample rate, set_sample_rate() will apply the params later
+        if self._sample_rate:
+            self.set_params(self._params)
+
     def set_params(self, params: VADParams):
         """Set VAD parameters and recalculate internal values.
 
@@ -0,0 +1,157 @@
+#
+# Copyright (c) 2024–2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import unittest
+from unittest.mock import patch
+
+try:
+    import my_bot
+except ImportError:
+    # my_bot needs the webrtc, silero, openai and anthropic extras
+    my_bot = None
+
+
+@unittest.skipIf(my_bot is None, "my_bot dependencies not installed")
+class TestTTLCache(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = patch.object(my_bot.time, "monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_before_expiry(self):
+        cache = my_bot.TTLCache(maxsize=4, ttl=10)
+        cache.set("a", 1)
+        self.now += 9.9
+        self.assertEqual(cache.get("a"), 1)
+
+    def test_get_after_expiry(self):
+        cache = my_bot.TTLCache(maxsize=4, ttl=10)
+        cache.set("a", 1)
+        self.now += 10
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("a", "missing"), "missing")
+        self.assertNotIn("a", cache._data)
+
+    def test_set_refreshes_expiry(self):
+        cache = my_bot.TTLCache(maxsize=4, ttl=10)
+        cache.set("a", 1)
+        self.now += 8
+        cache.set("a", 2)
+        self.now += 8
+        self.assertEqual(cache.get("a"), 2)
+
+    def test_evicts_least_recently_set(self):
+        cache = my_bot.TTLCache(maxsize=2, ttl=10)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), 2)
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_get_marks_entry_recently_used(self):
+        cache = my_bot.TTLCache(maxsize=2, ttl=10)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_pop(self):
+        cache = my_bot.TTLCache(maxsize=4, ttl=10)
+        cache.set("a", 1)
+        self.assertEqual(cache.pop("a"), 1)
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNone(cache.pop("a"))
+        self.assertEqual(cache.pop("a", "missing"), "missing")
+
+    def test_pop_returns_expired_value(self):
+        cache = my_bot.TTLCache(maxsize=4, ttl=10)
+        cache.set("a", 1)
+        self.now += 20
+        self.assertEqual(cache.pop("a"), 1)
+
+
+RSS_FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0">
+<channel>
+<title>Google News</title>
+<item><title>"luna" - Google News</title></item>
+<item><title>First &amp; foremost</title><link>https://example.com/1</link></item>
+<item><title>  Second &lt;headline&gt;  </title></item>
+<item><title></title></item>
+<item><title>Third</title></item>
+<item><title>Fourth</title></item>
+</channel>
+</rss>
+"""
+
+
+class FakeContent:
+    """Stands in for aiohttp's StreamReader, yielding the body in fixed-size chunks."""
+
+    def __init__(self, body: bytes, chunk_size: int):
+        self.body = body
+        self.chunk_size = chunk_size
+        self.bytes_read = 0
+
+    async def iter_chunked(self, n: int):
+        for i in range(0, len(self.body), self.chunk_size):
+            chunk = self.body[i : i + self.chunk_size]
+            self.bytes_read += len(chunk)
+            yield chunk
+
+
+class FakeResponse:
+    def __init__(self, body: bytes, chunk_size: int):
+        self.content = FakeContent(body, chunk_size)
+
+
+@unittest.skipIf(my_bot is None, "my_bot dependencies not installed")
+class TestReadRssTitles(unittest.IsolatedAsyncioTestCase):
+    CHUNK_SIZES = (1, 7, 64, 8192)
+
+    async def read(self, body: bytes, limit: int, chunk_size: int):
+        resp = FakeResponse(body, chunk_size)
+        titles = await my_bot.read_rss_titles(resp, limit)
+        # The whole body is always consumed so the connection can be reused
+        self.assertEqual(resp.content.bytes_read, len(body))
+        return titles
+
+    async def test_item_titles(self):
+        for chunk_size in self.CHUNK_SIZES:
+            with self.subTest(chunk_size=chunk_size):
+                titles = await self.read(RSS_FEED, limit=10, chunk_size=chunk_size)
+                # Channel title, quoted and empty titles are skipped; entities decoded
+                self.assertEqual(
+                    titles, ["First & foremost", "Second <headline>", "Third", "Fourth"]
+                )
+
+    async def test_limit(self):
+        for chunk_size in self.CHUNK_SIZES:
+            with self.subTest(chunk_size=chunk_size):
+                titles = await self.read(RSS_FEED, limit=2, chunk_size=chunk_size)
+                self.assertEqual(titles, ["First & foremost", "Second <headline>"])
+
+    async def test_malformed_feed(self):
+        body = RSS_FEED.replace(b"<title>Third</title>", b"<title>Third</titel>")
+        for chunk_size in self.CHUNK_SIZES:
+            with self.subTest(chunk_size=chunk_size):
+                titles = await self.read(body, limit=10, chunk_size=chunk_size)
+                self.assertEqual(titles, ["First & foremost", "Second <headline>"])
+
+    async def test_not_xml(self):
+        for chunk_size in self.CHUNK_SIZES:
+            with self.subTest(chunk_size=chunk_size):
+                titles = await self.read(b"<html><p>oops</html>", limit=3, chunk_size=chunk_size)
+                self.assertEqual(titles, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
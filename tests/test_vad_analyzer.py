@@ -0,0 +1,104 @@
+#
+# Copyright (c) 2024–2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import unittest
+
+import numpy as np
+
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams, VADState
+
+
+class ConstantVADAnalyzer(VADAnalyzer):
+    """VAD analyzer that reports the same confidence for every chunk."""
+
+    def __init__(self, confidence: float, **kwargs):
+        super().__init__(**kwargs)
+        self.confidence = confidence
+
+    def num_frames_required(self) -> int:
+        return 160
+
+    def voice_confidence(self, buffer) -> float:
+        return self.confidence
+
+
+def loud_audio(num_samples: int) -> bytes:
+    return (np.ones(num_samples, dtype=np.int16) * 20000).tobytes()
+
+
+class TestVADAnalyzerReset(unittest.IsolatedAsyncioTestCase):
+    async def test_reset_clears_stream_state(self):
+        analyzer = ConstantVADAnalyzer(1.0, params=VADParams(start_secs=0.01, min_volume=0.0))
+        analyzer.set_sample_rate(16000)
+
+        # Two full chunks to start speaking, plus a partial chunk left in the buffer
+        state = await analyzer.analyze_audio(loud_audio(160 * 2 + 50))
+        self.assertEqual(state, VADState.SPEAKING)
+        self.assertGreater(analyzer._prev_volume, 0)
+        self.assertEqual(len(analyzer._vad_buffer), 100)
+
+        analyzer.reset()
+
+        self.assertEqual(analyzer._vad_buffer, b"")
+        self.assertEqual(analyzer._prev_volume, 0)
+        self.assertEqual(analyzer._vad_state, VADState.QUIET)
+
+    async def test_reset_restores_constructor_params(self):
+        params = VADParams(stop_secs=0.5)
+        analyzer = ConstantVADAnalyzer(0.0, params=params)
+        analyzer.set_sample_rate(16000)
+        analyzer.set_params(VADParams(stop_secs=2.0))
+
+        analyzer.reset()
+
+        self.assertEqual(analyzer.params, params)
+
+    async def test_reset_with_params(self):
+        analyzer = ConstantVADAnalyzer(0.0)
+        analyzer.set_sample_rate(16000)
+
+        analyzer.reset(VADParams(min_volume=0.9))
+
+        self.assertEqual(analyzer.params.min_volume, 0.9)
+
+    async def test_reset_before_sample_rate(self):
+        analyzer = ConstantVADAnalyzer(0.0, params=VADParams(stop_secs=0.5))
+        analyzer.reset(VADParams(stop_secs=1.0))
+
+        # Params are applied once the sample rate is known
+        analyzer.set_sample_rate(16000)
+        self.assertEqual(analyzer.params.stop_secs, 1.0)
+        self.assertEqual(analyzer._vad_state, VADState.QUIET)
+
+
+@unittest.skipIf(onnxruntime is None, "onnxruntime not installed")
+class TestSileroVADAnalyzerReset(unittest.IsolatedAsyncioTestCase):
+    async def test_reset_clears_model_state(self):
+        from pipecat.audio.vad.silero import SileroVADAnalyzer
+
+        analyzer = SileroVADAnalyzer(sample_rate=16000)
+        analyzer.set_sample_rate(16000)
+
+        rng = np.random.default_rng(0)
+        noise = (rng.standard_normal(512) * 8000).astype(np.int16).tobytes()
+        # The first call also runs the model's periodic state reset, so analyze twice
+        analyzer.voice_confidence(noise)
+        analyzer.voice_confidence(noise)
+        self.assertTrue(np.any(analyzer._model._state))
+
+        analyzer.reset()
+
+        self.assertFalse(np.any(analyzer._model._state))
+        self.assertEqual(analyzer._vad_buffer, b"")
+
+
+if __name__ == "__main__":
+    unittest.main()